@@ -4,15 +4,252 @@ Landsat GIF Animator - Creates animated GIFs from Landsat satellite imagery
 """
 
 import os
+import io
+import re
 import sys
+import math
+import time
+import shutil
+import tempfile
+import uuid
+import sqlite3
+import hashlib
+import functools
+import subprocess
 import click
-import ee
-from geopy.geocoders import Nominatim
-import imageio
 import numpy as np
-from datetime import datetime, timedelta
+from PIL import Image, ImageColor
+from collections import Counter
+from collections.abc import Mapping
+from contextlib import closing
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 import json
-import urllib.request
+
+
+@functools.lru_cache(maxsize=None)
+def _geolocator():
+    """
+    Shared Nominatim client
+    
+    Reusing one client keeps its requests session, and so its keep-alive
+    connection, open across lookups.
+    """
+    from geopy.adapters import RequestsAdapter
+    from geopy.geocoders import Nominatim
+    
+    return Nominatim(user_agent="landsat_animator", adapter_factory=RequestsAdapter)
+
+
+@functools.lru_cache(maxsize=1024)
+def _geocode_cached(query):
+    """
+    Geocode a normalized location string, memoized for the process lifetime
+    
+    Args:
+        query: Location string, stripped and lowercased
+        
+    Returns:
+        Tuple of (latitude, longitude), or None if not found
+    """
+    location_data = _geolocator().geocode(query)
+    if location_data:
+        return location_data.latitude, location_data.longitude
+    return None
+
+
+def _open_rgb(filepath):
+    """Decode an image file into a loaded RGB PIL image"""
+    with Image.open(filepath) as image:
+        return image.convert('RGB')
+
+
+def _read_rgb(filepath):
+    """Decode an image file straight into an RGB uint8 array"""
+    return np.asarray(_open_rgb(filepath))
+
+
+# Index expressions of the form (A - B) / (A + B)
+_NORMALIZED_DIFFERENCE = re.compile(r'^\((\w+) - (\w+)\) / \((\w+) \+ (\w+)\)$')
+
+
+def _palette_lut(palette):
+    """
+    Interpolate a color palette into a lookup table
+    
+    Args:
+        palette: List of color names, evenly spaced from min to max
+        
+    Returns:
+        Read-only uint8 array of shape (256, 3)
+    """
+    colors = np.array([ImageColor.getrgb(name) for name in palette], dtype=np.float64)
+    stops = np.linspace(0, 255, len(palette))
+    positions = np.arange(256)
+    lut = np.stack([np.interp(positions, stops, colors[:, channel]) for channel in range(3)], axis=-1)
+    lut = np.rint(lut).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def _normalized_difference(a, b):
+    """
+    Compute (a - b) / (a + b) elementwise
+    
+    Args:
+        a: Float array, overwritten with the result
+        b: Float array of the same shape
+        
+    Returns:
+        a, holding the index values
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = np.add(a, b)
+        np.add(denom, 1e-9, out=denom)
+        np.subtract(a, b, out=a)
+        np.divide(a, denom, out=a)
+    return a
+
+
+def _stretch_to_uint8(values, vmin, vmax):
+    """
+    Linearly map values in [vmin, vmax] to [0, 255], rounding to nearest
+    
+    Args:
+        values: Float array
+        vmin: Value mapped to 0
+        vmax: Value mapped to 255
+        
+    Returns:
+        uint8 array of the same shape
+    """
+    scaled = np.subtract(values, vmin, dtype=np.float32)
+    np.multiply(scaled, 255 / (vmax - vmin), out=scaled)
+    np.add(scaled, 0.5, out=scaled)
+    np.clip(np.nan_to_num(scaled, copy=False), 0, 255, out=scaled)
+    out = np.empty(scaled.shape, dtype=np.uint8)
+    np.copyto(out, scaled, casting='unsafe')
+    return out
+
+
+def _to_reflectance(dn, gain, offset):
+    """Convert digital numbers to float32 surface reflectance"""
+    reflectance = np.multiply(dn, gain, dtype=np.float32)
+    np.add(reflectance, offset, out=reflectance)
+    return reflectance
+
+
+# Rows converted to float at a time by the NumPy fallbacks, which keeps
+# temporaries small instead of frame-sized
+_TILE_ROWS = 64
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_kernels():
+    """
+    Compile the fused rendering kernels on first use
+    
+    Numba is optional and slow to import, so it is only loaded once a frame
+    is rendered.
+    
+    Returns:
+        Tuple of (index_kernel, stretch_kernel), or None if Numba is missing
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:  # Numba is optional; rendering falls back to NumPy
+        return None
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def index_kernel(a, b, gain, offset, vmin, vmax, lut, out):
+        """Fused scaling, normalized difference, stretch and palette lookup"""
+        scale = 255.0 / (vmax - vmin)
+        for i in prange(a.shape[0]):
+            for j in range(a.shape[1]):
+                first = a[i, j] * gain + offset
+                second = b[i, j] * gain + offset
+                denom = first + second + 1e-9
+                value = (first - second) / denom if denom != 0 else 0.0
+                level = (value - vmin) * scale + 0.5
+                level = min(max(level, 0.0), 255.0)
+                for channel in range(3):
+                    out[i, j, channel] = lut[int(level), channel]
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def stretch_kernel(band, gain, offset, vmin, vmax, out):
+        """Fused scaling and linear stretch of one band to uint8"""
+        scale = 255.0 / (vmax - vmin)
+        for i in prange(band.shape[0]):
+            for j in range(band.shape[1]):
+                level = (band[i, j] * gain + offset - vmin) * scale + 0.5
+                out[i, j] = int(min(max(level, 0.0), 255.0))
+    
+    return index_kernel, stretch_kernel
+
+
+def _render_index(a, b, gain, offset, vmin, vmax, lut):
+    """
+    Render a normalized difference index through a palette
+    
+    Args:
+        a: First operand band (uint16 digital numbers)
+        b: Second operand band (uint16 digital numbers)
+        gain: Scale factor from digital numbers to reflectance
+        offset: Offset from digital numbers to reflectance
+        vmin: Index value mapped to the first palette entry
+        vmax: Index value mapped to the last palette entry
+        lut: Palette lookup table from _palette_lut()
+        
+    Returns:
+        uint8 array of shape (height, width, 3)
+    """
+    out = np.empty(a.shape + (3,), dtype=np.uint8)
+    kernels = _numba_kernels()
+    
+    if kernels is not None:
+        index_kernel, _ = kernels
+        index_kernel(a, b, gain, offset, float(vmin), float(vmax), lut, out)
+        return out
+    
+    for start in range(0, a.shape[0], _TILE_ROWS):
+        rows = slice(start, start + _TILE_ROWS)
+        values = _normalized_difference(_to_reflectance(a[rows], gain, offset),
+                                        _to_reflectance(b[rows], gain, offset))
+        out[rows] = lut[_stretch_to_uint8(values, vmin, vmax)]
+    return out
+
+
+def _render_bands(bands, gain, offset, vmin, vmax):
+    """
+    Stretch one or more bands to a uint8 image
+    
+    Args:
+        bands: List of 2-D band arrays (uint16 digital numbers)
+        gain: Scale factor from digital numbers to reflectance
+        offset: Offset from digital numbers to reflectance
+        vmin: Reflectance mapped to 0
+        vmax: Reflectance mapped to 255
+        
+    Returns:
+        uint8 array of shape (height, width, len(bands)), or (height, width)
+        for a single band
+    """
+    out = np.empty(bands[0].shape + (len(bands),), dtype=np.uint8)
+    kernels = _numba_kernels()
+    
+    for channel, band in enumerate(bands):
+        if kernels is not None:
+            _, stretch_kernel = kernels
+            stretch_kernel(band, gain, offset, float(vmin), float(vmax), out[..., channel])
+            continue
+        
+        for start in range(0, band.shape[0], _TILE_ROWS):
+            rows = slice(start, start + _TILE_ROWS)
+            out[rows, :, channel] = _stretch_to_uint8(
+                _to_reflectance(band[rows], gain, offset), vmin, vmax)
+    
+    return out[..., 0] if len(bands) == 1 else out
 
 
 class LandsatAnimator:
@@ -22,62 +259,172 @@ class LandsatAnimator:
     # Using Landsat Collection 2 Level 2 surface reflectance bands (SR_B*)
     VISUALIZATION_MODES = {
         'rgb': {
-            'bands': ['SR_B4', 'SR_B3', 'SR_B2'],  # Red, Green, Blue for Landsat 8
+            'bands': ('SR_B4', 'SR_B3', 'SR_B2'),  # Red, Green, Blue for Landsat 8
             'min': 0,
             'max': 0.3,
             'description': 'Natural color (RGB)'
         },
         'false_color': {
-            'bands': ['SR_B5', 'SR_B4', 'SR_B3'],  # NIR, Red, Green
+            'bands': ('SR_B5', 'SR_B4', 'SR_B3'),  # NIR, Red, Green
             'min': 0,
             'max': 0.3,
             'description': 'False color infrared'
         },
         'ndvi': {
             'expression': '(NIR - RED) / (NIR + RED)',
-            'bands': {'NIR': 'SR_B5', 'RED': 'SR_B4'},
-            'palette': ['blue', 'white', 'green'],
+            'bands': MappingProxyType({'NIR': 'SR_B5', 'RED': 'SR_B4'}),
+            'palette': ('blue', 'white', 'green'),
             'min': -1,
             'max': 1,
             'description': 'Normalized Difference Vegetation Index'
         },
         'panchromatic': {
-            'bands': ['SR_B8'],  # Panchromatic band
+            'bands': ('SR_B8',),  # Panchromatic band
             'min': 0,
             'max': 0.3,
             'description': 'Panchromatic (grayscale)'
         },
         'built_up': {
             'expression': '(SWIR - NIR) / (SWIR + NIR)',
-            'bands': {'SWIR': 'SR_B6', 'NIR': 'SR_B5'},
-            'palette': ['white', 'yellow', 'red'],
+            'bands': MappingProxyType({'SWIR': 'SR_B6', 'NIR': 'SR_B5'}),
+            'palette': ('white', 'yellow', 'red'),
             'min': -1,
             'max': 1,
             'description': 'Built-up index'
         },
         'snow': {
             'expression': '(GREEN - SWIR) / (GREEN + SWIR)',
-            'bands': {'GREEN': 'SR_B3', 'SWIR': 'SR_B6'},
-            'palette': ['black', 'cyan', 'white'],
+            'bands': MappingProxyType({'GREEN': 'SR_B3', 'SWIR': 'SR_B6'}),
+            'palette': ('black', 'cyan', 'white'),
             'min': -1,
             'max': 1,
             'description': 'Normalized Difference Snow Index'
         }
     }
     
+    # Read-only views, so no caller can change the modes for everyone else
+    VISUALIZATION_MODES = MappingProxyType({
+        mode: MappingProxyType(config) for mode, config in VISUALIZATION_MODES.items()
+    })
+    
+    # Surface reflectance bands each mode reads
+    _MODE_BANDS = {
+        mode: tuple(config['bands'].values()) if isinstance(config['bands'], Mapping)
+        else config['bands']
+        for mode, config in VISUALIZATION_MODES.items()
+    }
+    
+    # Palette lookup tables for client-side rendering, built once per mode
+    _PALETTE_LUTS = {
+        mode: _palette_lut(config['palette'])
+        for mode, config in VISUALIZATION_MODES.items() if 'palette' in config
+    }
+    
+    # Landsat 8 Collection 2, Tier 1, Level 2 (Surface Reflectance)
+    COLLECTION_ID = 'LANDSAT/LC08/C02/T1_L2'
+    
+    # Collection 2 Level 2 scaling from digital numbers to surface reflectance
+    SR_SCALE = 0.0000275
+    SR_OFFSET = -0.2
+    
+    # Output frame size in pixels (frames are square)
+    DIMENSIONS = 1024
+    
+    # Approximate length of one degree of latitude (or longitude at the equator)
+    METERS_PER_DEG = 111320.0
+    
+    # Number of frames downloaded concurrently (downloads are network-bound)
+    DOWNLOAD_WORKERS = 16
+    
+    # Response size budget for a single computePixels request (EE caps these at 48 MB)
+    MAX_REQUEST_BYTES = 40 * 1024 * 1024
+    
+    # Size cap for the on-disk frame cache; least recently used frames go first
+    FRAME_CACHE_BYTES = 2 * 1024 ** 3
+    
+    # Seconds between status checks of Cloud Storage export tasks
+    EXPORT_POLL_SECONDS = 5
+    
+    # Give up on (and cancel) exports that haven't finished after this long
+    EXPORT_TIMEOUT_SECONDS = 2 * 60 * 60
+    
+    # Chunk size used when streaming downloads to disk
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    
     def __init__(self):
         """Initialize the animator"""
         self.output_dir = 'output'
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Persistent cache shared across runs (geocoding results, etc.)
+        self.cache_dir = os.path.expanduser('~/.cache/landsat_animator')
+        self._geocode_cache = None
+        self._ee_initialized = False
+        
+        # HTTP session for download_image(), created on first use
+        self._session = None
+        
+        # Worker pool shared by every animation this instance generates
+        self.executor = ThreadPoolExecutor(max_workers=self.DOWNLOAD_WORKERS)
+    
+    def __enter__(self):
+        """Use the animator as a context manager that closes its connections"""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close pooled network connections on exit"""
+        self.close()
+    
+    def close(self):
+        """Close pooled network connections and worker threads"""
+        self.executor.shutdown(cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def _http_session(self):
+        """
+        Pooled, retrying HTTP session, created on first use
+        
+        Only download_image() uses it: generate_animation fetches pixels
+        through ee.data.computePixels and geocodes through geopy, which have
+        their own connections and retries, so a normal run never imports
+        requests here.
+        
+        Returns:
+            requests Session
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                            respect_retry_after_header=True)
+            adapter = HTTPAdapter(pool_connections=self.DOWNLOAD_WORKERS,
+                                  pool_maxsize=self.DOWNLOAD_WORKERS,
+                                  max_retries=retries)
+            self._session = requests.Session()
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+        
+        return self._session
+        
     def initialize_earth_engine(self):
-        """Initialize Google Earth Engine"""
+        """Initialize Google Earth Engine, once per animator"""
+        if self._ee_initialized:
+            return
+        
+        import ee
+        
         try:
             ee.Initialize()
         except Exception as e:
             click.echo(f"Error initializing Earth Engine: {e}")
             click.echo("Please authenticate first by running: earthengine authenticate")
             sys.exit(1)
+        
+        self._ee_initialized = True
     
     def get_coordinates(self, location):
         """
@@ -89,26 +436,121 @@ class LandsatAnimator:
         Returns:
             Tuple of (latitude, longitude)
         """
-        # Check if input is already coordinates
+        return self.get_coordinates_many([location])[0]
+    
+    def get_coordinates_many(self, locations):
+        """
+        Convert several city names or lat/long strings to coordinates
+        
+        Names missing from the cache are geocoded one after another at most
+        once per second, as Nominatim's usage policy requires, and the cache
+        is written once at the end.
+        
+        Args:
+            locations: List of "lat,long" strings or city names
+            
+        Returns:
+            List of (latitude, longitude) tuples, in the same order
+        """
+        # Parse "lat,long" input before touching the cache at all
+        results = [self._parse_coordinates(location) for location in locations]
+        names = {location.strip().lower(): location
+                 for location, coords in zip(locations, results) if coords is None}
+        if not names:
+            return results
+        
+        cache = self._load_geocode_cache()
+        uncached = {key: location for key, location in names.items() if key not in cache}
+        
+        if uncached:
+            from geopy.extra.rate_limiter import RateLimiter
+            
+            # Only space requests out; a failed lookup is reported straight away
+            geocode = RateLimiter(_geocode_cached, min_delay_seconds=1, max_retries=0,
+                                  swallow_exceptions=False)
+            try:
+                for key, location in uncached.items():
+                    # Geocode city name
+                    try:
+                        coords = geocode(key)
+                        if not coords:
+                            raise ValueError(f"Could not find location: {location}")
+                    except Exception as e:
+                        raise ValueError(f"Error geocoding location: {e}")
+                    
+                    cache[key] = {'lat': coords[0], 'lon': coords[1], 'ts': time.time()}
+            finally:
+                # Keep whatever was resolved even if a later lookup failed
+                self._save_geocode_cache(cache)
+        
+        for i, location in enumerate(locations):
+            if results[i] is None:
+                entry = cache[location.strip().lower()]
+                results[i] = entry['lat'], entry['lon']
+        
+        return results
+    
+    def _parse_coordinates(self, location):
+        """
+        Parse a "lat,long" string
+        
+        Args:
+            location: Location string
+            
+        Returns:
+            Tuple of (latitude, longitude), or None if it is not coordinates
+        """
         if ',' in location:
             try:
                 parts = location.split(',')
-                lat = float(parts[0].strip())
-                lon = float(parts[1].strip())
-                return lat, lon
+                return float(parts[0].strip()), float(parts[1].strip())
             except ValueError:
                 pass
+        return None
+    
+    def _geocode_cache_path(self):
+        """Path of the JSON file holding cached geocoding results"""
+        return os.path.join(self.cache_dir, 'geocode.json')
+    
+    def _load_geocode_cache(self):
+        """
+        Load cached geocoding results, reading the file only on first use
+        
+        Returns:
+            Dict mapping normalized location to {'lat', 'lon', 'ts'}
+        """
+        if self._geocode_cache is None:
+            try:
+                with open(self._geocode_cache_path()) as f:
+                    self._geocode_cache = json.load(f)
+            except (OSError, ValueError):
+                self._geocode_cache = {}
         
-        # Geocode city name
+        return self._geocode_cache
+    
+    def _save_geocode_cache(self, cache):
+        """
+        Write geocoding results back to disk
+        
+        Args:
+            cache: Dict mapping normalized location to {'lat', 'lon', 'ts'}
+        """
+        path = self._geocode_cache_path()
         try:
-            geolocator = Nominatim(user_agent="landsat_animator")
-            location_data = geolocator.geocode(location)
-            if location_data:
-                return location_data.latitude, location_data.longitude
-            else:
-                raise ValueError(f"Could not find location: {location}")
-        except Exception as e:
-            raise ValueError(f"Error geocoding location: {e}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write under a unique temporary name so concurrent runs never
+            # read (or publish) each other's partial files
+            with tempfile.NamedTemporaryFile('w', dir=self.cache_dir, suffix='.tmp',
+                                             delete=False) as f:
+                json.dump(cache, f)
+            try:
+                os.replace(f.name, path)
+            except OSError:
+                os.remove(f.name)
+                raise
+        except OSError:
+            # Caching is best-effort; a read-only home directory is not fatal
+            pass
     
     def calculate_region(self, lat, lon, scale=60000):
         """
@@ -122,24 +564,64 @@ class LandsatAnimator:
         Returns:
             Earth Engine Geometry
         """
+        import ee
+        
+        return ee.Geometry.Rectangle(list(self.calculate_bounds(lat, lon, scale)))
+    
+    def calculate_bounds(self, lat, lon, scale=60000):
+        """
+        Calculate bounding box coordinates for 1:scale view at given coordinates
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            scale: Map scale (default 1:60000)
+            
+        Returns:
+            Tuple of (west, south, east, north) in degrees
+        """
         # For 1024 pixels, calculate the ground distance
         # At 1:60000 scale, 1024 pixels = 61.44 km (60m per pixel)
         meters_per_pixel = scale / 1000  # 60m at 1:60000
-        width_meters = 1024 * meters_per_pixel
+        width_meters = self.DIMENSIONS * meters_per_pixel
         
         # Convert to degrees (approximate)
         # At equator: 1 degree ≈ 111,320 meters
         # This is approximate and works reasonably well for small areas
-        lat_degrees = width_meters / 111320
-        lon_degrees = width_meters / (111320 * np.cos(np.radians(lat)))
+        lat_degrees = width_meters / self.METERS_PER_DEG
+        lon_degrees = width_meters / (self.METERS_PER_DEG * math.cos(math.radians(lat)))
         
         # Create bounding box
-        return ee.Geometry.Rectangle([
+        return (
             lon - lon_degrees / 2,
             lat - lat_degrees / 2,
             lon + lon_degrees / 2,
             lat + lat_degrees / 2
-        ])
+        )
+    
+    def pixel_grid(self, bounds):
+        """
+        Build an Earth Engine pixel grid covering the bounding box
+        
+        Args:
+            bounds: Tuple of (west, south, east, north) in degrees
+            
+        Returns:
+            Grid dictionary for ee.data.computePixels
+        """
+        west, south, east, north = bounds
+        return {
+            'dimensions': {'width': self.DIMENSIONS, 'height': self.DIMENSIONS},
+            'affineTransform': {
+                'scaleX': (east - west) / self.DIMENSIONS,
+                'shearX': 0,
+                'translateX': west,
+                'shearY': 0,
+                'scaleY': (south - north) / self.DIMENSIONS,
+                'translateY': north
+            },
+            'crsCode': 'EPSG:4326'
+        }
     
     def scale_landsat_c2(self, image):
         """
@@ -152,12 +634,12 @@ class LandsatAnimator:
             Scaled image
         """
         # Optical bands (scale factor: 0.0000275, offset: -0.2)
-        optical_bands = image.select('SR_B.').multiply(0.0000275).add(-0.2)
+        optical_bands = image.select('SR_B.').multiply(self.SR_SCALE).add(self.SR_OFFSET)
         
         # Return scaled image
         return image.addBands(optical_bands, None, True)
     
-    def get_landsat_collection(self, region, start_date, end_date, cloud_cover=10):
+    def get_landsat_collection(self, region, start_date, end_date, cloud_cover=10, scaled=True):
         """
         Get Landsat image collection for the region and time period
         
@@ -166,16 +648,22 @@ class LandsatAnimator:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             cloud_cover: Maximum cloud cover percentage
+            scaled: Convert bands to surface reflectance; if False, bands are
+                left as uint16 digital numbers
             
         Returns:
             Earth Engine ImageCollection
         """
+        import ee
+        
         # Use Landsat 8 Collection 2, Tier 1, Level 2 (Surface Reflectance)
-        collection = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2') \
+        collection = ee.ImageCollection(self.COLLECTION_ID) \
             .filterBounds(region) \
             .filterDate(start_date, end_date) \
-            .filter(ee.Filter.lt('CLOUD_COVER', cloud_cover)) \
-            .map(self.scale_landsat_c2)
+            .filter(ee.Filter.lt('CLOUD_COVER', cloud_cover))
+        
+        if scaled:
+            collection = collection.map(self.scale_landsat_c2)
         
         return collection
     
@@ -190,40 +678,43 @@ class LandsatAnimator:
         Returns:
             List of image info dictionaries
         """
-        # Get collection size
-        size = collection.size().getInfo()
+        import ee
         
-        if size == 0:
-            return []
+        # Tag each image with its year-month so the server can group by month
+        tagged = collection.map(
+            lambda image: image.set('ym', ee.Date(image.get('system:time_start')).format('YYYY-MM'))
+        )
         
-        # Get all dates and cloud cover values in batch (more efficient than N+1 queries)
-        images_list = collection.toList(size)
-        dates = collection.aggregate_array('system:time_start').getInfo()
-        cloud_covers = collection.aggregate_array('CLOUD_COVER').getInfo()
+        # Join every month to its images ordered by cloud cover and keep the
+        # first (clearest) one, so the selection happens server-side
+        join = ee.Join.saveAll(matchesKey='matches', ordering='CLOUD_COVER', ascending=True)
+        joined = join.apply(
+            primary=tagged.distinct('ym'),
+            secondary=tagged,
+            condition=ee.Filter.equals(leftField='ym', rightField='ym')
+        )
+        monthly = ee.ImageCollection(
+            joined.map(lambda month: ee.Image(ee.List(month.get('matches')).get(0)))
+        ).sort('ym')
         
-        # Group by year-month
-        monthly_images = {}
+        # Get the picked months, cloud cover values and scene IDs in a single round-trip
+        rows = monthly.reduceColumns(ee.Reducer.toList(3), ['ym', 'CLOUD_COVER', 'system:index']) \
+            .get('list').getInfo()
         
-        for i in range(size):
-            # Format date as YYYY-MM
-            date_ms = dates[i]
-            date_obj = datetime.utcfromtimestamp(date_ms / 1000)
-            date_str = date_obj.strftime('%Y-%m')
-            
-            cloud_cover = cloud_covers[i]
-            
-            # Keep the image with lowest cloud cover for each month
-            if date_str not in monthly_images or cloud_cover < monthly_images[date_str]['cloud_cover']:
-                monthly_images[date_str] = {
-                    'image': ee.Image(images_list.get(i)),
-                    'date': date_str,
-                    'cloud_cover': cloud_cover
-                }
+        if not rows:
+            return []
         
-        # Sort by date
-        sorted_images = sorted(monthly_images.values(), key=lambda x: x['date'])
+        images_list = monthly.toList(len(rows))
         
-        return sorted_images
+        return [
+            {
+                'image': ee.Image(images_list.get(i)),
+                'date': date,
+                'cloud_cover': cloud_cover,
+                'scene_id': scene_id
+            }
+            for i, (date, cloud_cover, scene_id) in enumerate(rows)
+        ]
     
     def apply_visualization(self, image, mode='rgb'):
         """
@@ -242,7 +733,7 @@ class LandsatAnimator:
             # Calculate index using expression
             result = image.expression(
                 vis_config['expression'],
-                vis_config['bands']
+                dict(vis_config['bands'])
             )
             
             # Apply color palette
@@ -250,39 +741,450 @@ class LandsatAnimator:
                 result = result.visualize(
                     min=vis_config['min'],
                     max=vis_config['max'],
-                    palette=vis_config['palette']
+                    palette=list(vis_config['palette'])
                 )
         else:
             # Select bands and visualize
-            result = image.select(vis_config['bands']).visualize(
+            result = image.select(list(vis_config['bands'])).visualize(
                 min=vis_config['min'],
                 max=vis_config['max']
             )
         
         return result
     
-    def download_image(self, image, region, filename):
+    def mode_bands(self, mode):
+        """
+        List the surface reflectance bands a visualization mode reads
+        
+        Args:
+            mode: Visualization mode
+            
+        Returns:
+            List of band names
+        """
+        return list(self._MODE_BANDS.get(mode, self._MODE_BANDS['rgb']))
+    
+    def apply_visualization_np(self, bands, mode='rgb'):
+        """
+        Apply visualization to downloaded bands on the client
+        
+        Produces the same rendering as apply_visualization() from the raw bands,
+        so bands fetched once can be rendered in any mode. Scaling to surface
+        reflectance happens inside the rendering pass.
+        
+        Args:
+            bands: Dict mapping band name to uint16 digital number array
+            mode: Visualization mode
+            
+        Returns:
+            uint8 array of shape (height, width, 3), or (height, width) for
+            single-band modes without a palette
+        """
+        vis_config = self.VISUALIZATION_MODES.get(mode, self.VISUALIZATION_MODES['rgb'])
+        vmin, vmax = vis_config['min'], vis_config['max']
+        gain, offset = self.SR_SCALE, self.SR_OFFSET
+        
+        if 'expression' not in vis_config:
+            return _render_bands([bands[name] for name in vis_config['bands']],
+                                 gain, offset, vmin, vmax)
+        
+        # Calculate index from its two operand bands
+        match = _NORMALIZED_DIFFERENCE.match(vis_config['expression'])
+        if not match or match.group(1, 2) != match.group(3, 4):
+            raise ValueError(f"Unsupported expression: {vis_config['expression']}")
+        first, second = (bands[vis_config['bands'][name]] for name in match.group(1, 2))
+        
+        # Apply color palette
+        if 'palette' in vis_config:
+            return _render_index(first, second, gain, offset, vmin, vmax,
+                                 self._PALETTE_LUTS[mode])
+        
+        values = _normalized_difference(_to_reflectance(first, gain, offset),
+                                        _to_reflectance(second, gain, offset))
+        return _stretch_to_uint8(values, vmin, vmax)
+    
+    def download_image(self, image, region, filename, output_dir=None):
         """
-        Download image from Earth Engine
+        Download image from Earth Engine as a PNG file
+        
+        Not used by generate_animation, which fetches pixels in memory with
+        fetch_frames()/fetch_bands(); kept for callers that want files on disk.
         
         Args:
             image: Earth Engine Image
             region: Earth Engine Geometry
             filename: Output filename
+            output_dir: Output directory (default: self.output_dir)
         """
         # Get download URL
         url = image.getDownloadURL({
             'region': region,
-            'dimensions': 1024,
+            'dimensions': self.DIMENSIONS,
             'format': 'png'
         })
         
-        # Download the image
-        filepath = os.path.join(self.output_dir, filename)
-        urllib.request.urlretrieve(url, filepath)
+        # Stream the image to disk over the pooled session
+        filepath = os.path.join(output_dir or self.output_dir, filename)
+        with self._http_session().get(url, stream=True) as response:
+            response.raise_for_status()
+            with open(filepath, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
         
         return filepath
     
+    def fetch_frame(self, image, grid):
+        """
+        Fetch visualized image pixels from Earth Engine as a NumPy array
+        
+        Args:
+            image: Visualized Earth Engine Image
+            grid: Pixel grid from pixel_grid()
+            
+        Returns:
+            uint8 array of shape (height, width, bands), or (height, width)
+            for single-band images
+        """
+        return self.fetch_frames([image], grid)[0]
+    
+    def fetch_frames(self, images, grid):
+        """
+        Fetch several visualized images with a single Earth Engine request
+        
+        The images are stacked as bands of one image, so the whole batch costs
+        one computePixels round-trip.
+        
+        Args:
+            images: List of visualized Earth Engine Images with equal band counts
+            grid: Pixel grid from pixel_grid()
+            
+        Returns:
+            List of uint8 arrays, one per image, as returned by fetch_frame()
+        """
+        import ee
+        
+        stacked = ee.ImageCollection.fromImages(images).toBands()
+        data = ee.data.computePixels({
+            'expression': stacked,
+            'fileFormat': 'NPY',
+            'grid': grid
+        })
+        
+        # NPY responses are structured arrays with one field per band, in
+        # image order, so each image owns an equal run of consecutive fields
+        pixels = np.load(io.BytesIO(data))
+        names = pixels.dtype.names
+        bands = len(names) // len(images)
+        
+        frames = []
+        for i in range(len(images)):
+            frame = np.stack([pixels[name] for name in names[i * bands:(i + 1) * bands]], axis=-1)
+            frames.append(frame[..., 0] if bands == 1 else frame)
+        
+        return frames
+    
+    def fetch_bands(self, images, bands, grid):
+        """
+        Fetch raw bands of several images with a single Earth Engine request
+        
+        Args:
+            images: List of Earth Engine Images
+            bands: List of band names to fetch
+            grid: Pixel grid from pixel_grid()
+            
+        Returns:
+            List of dicts mapping band name to uint16 array, one per image
+        """
+        selected = [image.select(bands).toUint16() for image in images]
+        return [
+            {band: np.atleast_3d(pixels)[..., i] for i, band in enumerate(bands)}
+            for pixels in self.fetch_frames(selected, grid)
+        ]
+    
+    def export_bands(self, images, bands, grid, bucket):
+        """
+        Fetch raw bands of several images through Cloud Storage exports
+        
+        Exports take longer to start than computePixels requests but are not
+        subject to their response size limit. Requires the gcsfs and tifffile
+        packages.
+        
+        Args:
+            images: List of Earth Engine Images
+            bands: List of band names to fetch
+            grid: Pixel grid from pixel_grid()
+            bucket: Google Cloud Storage bucket to export into
+            
+        Returns:
+            List of dicts mapping band name to uint16 array, one per image
+        """
+        import ee
+        
+        try:
+            import gcsfs
+            import tifffile
+        except ImportError as e:
+            raise ValueError(f"Exporting to Cloud Storage requires gcsfs and tifffile: {e}")
+        
+        transform = grid['affineTransform']
+        dimensions = grid['dimensions']
+        prefix = f"landsat_animator/{uuid.uuid4().hex}"
+        
+        tasks = []
+        finished = set()
+        fs = None
+        try:
+            # Start one export per image on the same pixel grid as computePixels
+            for i, image in enumerate(images):
+                task = ee.batch.Export.image.toCloudStorage(
+                    image=image.select(bands).toUint16(),
+                    bucket=bucket,
+                    fileNamePrefix=f"{prefix}/frame_{i}",
+                    crs=grid['crsCode'],
+                    crsTransform=[transform['scaleX'], transform['shearX'], transform['translateX'],
+                                  transform['shearY'], transform['scaleY'], transform['translateY']],
+                    dimensions=f"{dimensions['width']}x{dimensions['height']}",
+                    fileFormat='GeoTIFF'
+                )
+                task.start()
+                tasks.append(task)
+            
+            # Wait for all exports to finish; any state other than queued,
+            # running or completed (including an unknown task) is a failure
+            deadline = time.monotonic() + self.EXPORT_TIMEOUT_SECONDS
+            while len(finished) < len(tasks):
+                if time.monotonic() > deadline:
+                    raise ValueError(f"Export tasks did not finish within "
+                                     f"{self.EXPORT_TIMEOUT_SECONDS} seconds")
+                time.sleep(self.EXPORT_POLL_SECONDS)
+                for task in tasks:
+                    if task in finished:
+                        continue
+                    status = task.status()
+                    if status['state'] == 'COMPLETED':
+                        finished.add(task)
+                    elif status['state'] not in ('READY', 'RUNNING'):
+                        raise ValueError(f"Export task {task.id} {status['state'].lower()}: "
+                                         f"{status.get('error_message', '')}")
+            
+            fs = gcsfs.GCSFileSystem()
+            results = []
+            for i in range(len(images)):
+                pixels = tifffile.imread(io.BytesIO(fs.cat_file(f"{bucket}/{prefix}/frame_{i}.tif")))
+                
+                # Band-interleaved GeoTIFFs decode as (bands, height, width)
+                if pixels.ndim == 3 and pixels.shape[0] == len(bands) and pixels.shape[-1] != len(bands):
+                    pixels = np.moveaxis(pixels, 0, -1)
+                results.append({band: np.atleast_3d(pixels)[..., j] for j, band in enumerate(bands)})
+        finally:
+            # Best-effort cleanup (also on Ctrl-C); it must not mask the original error
+            for task in tasks:
+                if task not in finished:
+                    try:
+                        task.cancel()
+                    except Exception:
+                        pass
+            try:
+                (fs or gcsfs.GCSFileSystem()).rm(f"{bucket}/{prefix}", recursive=True)
+            except Exception:
+                pass
+        
+        return results
+    
+    def frame_cache_key(self, bounds, scene_id, band):
+        """
+        Build the cache key identifying one band of a monthly frame
+        
+        Bands are cached as digital numbers rather than rendered frames so that
+        a download can be reused by every visualization mode. The key names the
+        scene rather than the month, so a clearer scene picked for a month on a
+        later run is fetched instead of the stale cached one.
+        
+        Args:
+            bounds: Tuple of (west, south, east, north) in degrees
+            scene_id: Earth Engine system:index of the frame's image
+            band: Band name
+            
+        Returns:
+            Hex digest string
+        """
+        bbox = ','.join(f'{value:.4f}' for value in bounds)
+        key = f'{self.COLLECTION_ID}|{bbox}|{self.DIMENSIONS}|{scene_id}|{band}|uint16'
+        return hashlib.sha1(key.encode()).hexdigest()
+    
+    def _frame_cache_dir(self):
+        """Directory holding cached frames"""
+        return os.path.join(self.cache_dir, 'frames')
+    
+    def _frame_index(self):
+        """
+        Open the index mapping frame cache keys to content digests
+        
+        Frames are stored once per distinct content under their digest, so
+        identical frames (e.g. empty months over water) share one file.
+        
+        Returns:
+            sqlite3 Connection
+        """
+        cache_dir = self._frame_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        index = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'))
+        index.execute('CREATE TABLE IF NOT EXISTS frames '
+                      '(key TEXT PRIMARY KEY, digest TEXT NOT NULL, used REAL NOT NULL)')
+        return index
+    
+    def load_cached_frame(self, key):
+        """
+        Load a frame cached by an earlier run
+        
+        Args:
+            key: Key from frame_cache_key()
+            
+        Returns:
+            Frame array, or None on a cache miss
+        """
+        return self.load_cached_frames([key])[0]
+    
+    def load_cached_frames(self, keys):
+        """
+        Load several cached frames through one index transaction
+        
+        Args:
+            keys: List of keys from frame_cache_key()
+            
+        Returns:
+            List holding a frame array, or None on a cache miss, per key
+        """
+        return list(self.iter_cached_frames([keys]))[0]
+    
+    def iter_cached_frames(self, key_groups):
+        """
+        Load groups of cached frames one group at a time through one index connection
+        
+        Only the current group is held in memory, so callers can render and
+        drop each group before the next one is read.
+        
+        Args:
+            key_groups: Iterable of lists of keys from frame_cache_key()
+            
+        Yields:
+            List holding a frame array, or None on a cache miss, per key of the group
+        """
+        try:
+            index = self._frame_index()
+        except (OSError, sqlite3.Error):
+            index = None
+        
+        hits = []
+        try:
+            for keys in key_groups:
+                frames = [None] * len(keys)
+                for i, key in enumerate(keys if index is not None else ()):
+                    try:
+                        row = index.execute('SELECT digest FROM frames WHERE key = ?',
+                                            (key,)).fetchone()
+                    except sqlite3.Error:
+                        continue
+                    if row is None:
+                        continue
+                    
+                    try:
+                        frames[i] = np.load(os.path.join(self._frame_cache_dir(), f'{row[0]}.npy'))
+                    except (OSError, ValueError):
+                        # Missing or truncated blob; treat as a miss and refetch
+                        continue
+                    hits.append(key)
+                
+                yield frames
+        finally:
+            if index is not None:
+                # Mark as recently used for eviction, in one transaction
+                try:
+                    now = time.time()
+                    index.executemany('UPDATE frames SET used = ? WHERE key = ?',
+                                      [(now, key) for key in hits])
+                    index.commit()
+                except sqlite3.Error:
+                    pass
+                index.close()
+    
+    def store_cached_frame(self, key, frame):
+        """
+        Save a frame for reuse by later runs
+        
+        Args:
+            key: Key from frame_cache_key()
+            frame: Frame array
+        """
+        content = hashlib.blake2b(f'{frame.dtype}{frame.shape}'.encode(), digest_size=16)
+        content.update(np.ascontiguousarray(frame))
+        digest = content.hexdigest()
+        path = os.path.join(self._frame_cache_dir(), f'{digest}.npy')
+        
+        try:
+            with closing(self._frame_index()) as index:
+                if not os.path.exists(path):
+                    # Write under a unique temporary name so readers never see
+                    # partial files, even with several runs storing the same frame
+                    with tempfile.NamedTemporaryFile(dir=self._frame_cache_dir(), suffix='.tmp',
+                                                     delete=False) as f:
+                        np.save(f, frame)
+                    try:
+                        os.replace(f.name, path)
+                    except OSError:
+                        os.remove(f.name)
+                        raise
+                
+                index.execute('INSERT OR REPLACE INTO frames VALUES (?, ?, ?)',
+                              (key, digest, time.time()))
+                index.commit()
+        except (OSError, sqlite3.Error):
+            # Caching is best-effort; a read-only home directory is not fatal
+            pass
+    
+    def prune_frame_cache(self):
+        """Evict least recently used frames until the cache fits FRAME_CACHE_BYTES"""
+        cache_dir = self._frame_cache_dir()
+        if not os.path.isdir(cache_dir):
+            return
+        
+        try:
+            with closing(self._frame_index()) as index:
+                sizes = {entry.name[:-len('.npy')]: entry.stat().st_size
+                         for entry in os.scandir(cache_dir) if entry.name.endswith('.npy')}
+                rows = index.execute('SELECT key, digest FROM frames ORDER BY used').fetchall()
+                references = Counter(digest for _, digest in rows)
+                total = sum(sizes.values())
+                
+                # Files no key points to any more can always go
+                for digest in set(sizes) - set(references):
+                    os.remove(os.path.join(cache_dir, f'{digest}.npy'))
+                    total -= sizes[digest]
+                
+                for key, digest in rows:
+                    if total <= self.FRAME_CACHE_BYTES:
+                        break
+                    index.execute('DELETE FROM frames WHERE key = ?', (key,))
+                    references[digest] -= 1
+                    if references[digest] == 0 and digest in sizes:
+                        os.remove(os.path.join(cache_dir, f'{digest}.npy'))
+                        total -= sizes[digest]
+                
+                index.commit()
+        except (OSError, sqlite3.Error):
+            pass
+    
+    def frames_per_request(self, bytes_per_pixel=3):
+        """
+        Number of frames that fit within one computePixels response
+        
+        Args:
+            bytes_per_pixel: Response size of one pixel across all bands
+                (default: 3, an RGB uint8 frame)
+        """
+        frame_bytes = self.DIMENSIONS * self.DIMENSIONS * bytes_per_pixel
+        return max(1, self.MAX_REQUEST_BYTES // frame_bytes)
+    
     def create_gif(self, image_files, output_filename, fps=12):
         """
         Create animated GIF from image files
@@ -292,29 +1194,137 @@ class LandsatAnimator:
             output_filename: Output GIF filename
             fps: Frames per second
         """
+        # Sample every file once for the palette, then decode them again one at a time
+        palette = self.global_palette(_read_rgb(filepath) for filepath in image_files)
+        frames = (_open_rgb(filepath) for filepath in image_files)
+        return self.create_gif_from_arrays(frames, output_filename, fps, palette=palette)
+    
+    def global_palette(self, frames, stride=8):
+        """
+        Build one palette shared by all frames from a downsampled union of them
+        
+        Args:
+            frames: Iterable of uint8 RGB or grayscale image arrays
+            stride: Take every stride-th pixel along each axis
+            
+        Returns:
+            Palette-mode PIL image to quantize frames against
+        """
+        samples = []
+        for frame in frames:
+            pixels = np.asarray(frame)[::stride, ::stride]
+            if pixels.ndim == 2:
+                # Grayscale frames stay single-channel; only the sample is widened
+                pixels = np.stack([pixels] * 3, axis=-1)
+            samples.append(pixels.reshape(-1, 3))
+        sample = np.concatenate(samples)
+        return Image.fromarray(sample.reshape(-1, 1, 3)).quantize(
+            colors=255, method=Image.Quantize.FASTOCTREE)
+    
+    def create_gif_from_arrays(self, frames, output_filename, fps=12, palette=None):
+        """
+        Create animated GIF from in-memory frames
+        
+        Args:
+            frames: Iterable of uint8 image arrays or PIL images
+            output_filename: Output GIF filename
+            fps: Frames per second
+            palette: Shared palette from global_palette(); computed from the
+                frames when omitted
+        """
+        if palette is None:
+            frames = list(frames)
+            palette = self.global_palette(frames)
+        
+        # Map every frame onto the shared palette instead of quantizing it separately
         images = []
-        for filepath in image_files:
-            img = imageio.imread(filepath)
-            images.append(img)
+        for frame in frames:
+            # Pillow only maps RGB onto a palette; grayscale is widened one frame at a time
+            image = frame if isinstance(frame, Image.Image) else Image.fromarray(np.asarray(frame))
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            images.append(image.quantize(palette=palette, dither=Image.Dither.NONE))
         
         output_path = os.path.join(self.output_dir, output_filename)
-        imageio.mimsave(output_path, images, fps=fps)
+        images[0].save(
+            output_path,
+            save_all=True,
+            append_images=images[1:],
+            optimize=True,
+            duration=int(1000 / fps),
+            loop=0
+        )
         
         return output_path
     
-    def generate_animation(self, location, mode='rgb', cloud_cover=10, fps=12):
+    def create_video_from_arrays(self, frames, output_filename, fps=12):
+        """
+        Encode in-memory frames as an H.264 MP4 video
+        
+        Video is far smaller than GIF for the same animation and is not
+        limited to 256 colors. Requires the imageio and imageio-ffmpeg packages.
+        
+        Args:
+            frames: Iterable of uint8 image arrays
+            output_filename: Output MP4 filename
+            fps: Frames per second
+        """
+        try:
+            import imageio
+            import imageio_ffmpeg  # Bundles the ffmpeg binary imageio writes through
+        except ImportError as e:
+            raise ValueError(f"Writing MP4 requires imageio and imageio-ffmpeg: {e}")
+        
+        output_path = os.path.join(self.output_dir, output_filename)
+        with imageio.get_writer(output_path, fps=fps, codec='libx264', quality=8,
+                                macro_block_size=1) as writer:
+            for frame in frames:
+                # H.264 with 4:2:0 chroma needs even dimensions
+                height, width = frame.shape[:2]
+                writer.append_data(frame[:height - height % 2, :width - width % 2])
+        
+        return output_path
+    
+    def optimize_gif(self, gif_path):
+        """
+        Recompress GIF in place with gifsicle, if it is installed
+        
+        Args:
+            gif_path: Path to GIF file
+            
+        Returns:
+            True if the GIF was optimized, False if gifsicle is unavailable
+        """
+        if not shutil.which('gifsicle'):
+            click.echo("Note: gifsicle not found, skipping GIF optimization")
+            return False
+        
+        # Run gifsicle directly rather than through pygifsicle: the binding
+        # appends a bare --optimize (i.e. -O1) after our options and ignores
+        # gifsicle's exit status
+        subprocess.run(['gifsicle', '-O3', '--lossy=30', '-o', gif_path, gif_path], check=True)
+        return True
+    
+    def generate_animation(self, location, mode='rgb', cloud_cover=10, fps=12, optimize=True,
+                           export_bucket=None, output_format='gif'):
         """
-        Generate animated GIF for location
+        Generate animated GIF (or MP4 video) for location
         
         Args:
             location: City name or "lat,long"
             mode: Visualization mode
             cloud_cover: Maximum cloud cover percentage
             fps: Frames per second for GIF
+            optimize: Recompress the GIF with gifsicle when available
+            export_bucket: Cloud Storage bucket to fetch bands through batch
+                exports instead of computePixels requests
+            output_format: 'gif' or 'mp4'
             
         Returns:
-            Path to generated GIF
+            Path to generated animation
         """
+        import ee
+        
         click.echo(f"Processing location: {location}")
         
         # Get coordinates
@@ -324,8 +1334,10 @@ class LandsatAnimator:
         # Initialize Earth Engine
         self.initialize_earth_engine()
         
-        # Calculate region
-        region = self.calculate_region(lat, lon)
+        # Calculate region and the matching output pixel grid
+        bounds = self.calculate_bounds(lat, lon)
+        region = ee.Geometry.Rectangle(list(bounds))
+        grid = self.pixel_grid(bounds)
         
         # Get Landsat collection (from 2013 when Landsat 8 launched to present)
         start_date = '2013-01-01'
@@ -335,7 +1347,9 @@ class LandsatAnimator:
         click.echo(f"Cloud cover filter: <{cloud_cover}%")
         click.echo(f"Visualization mode: {mode} - {self.VISUALIZATION_MODES[mode]['description']}")
         
-        collection = self.get_landsat_collection(region, start_date, end_date, cloud_cover)
+        # Bands stay as uint16 digital numbers until rendering
+        collection = self.get_landsat_collection(region, start_date, end_date, cloud_cover,
+                                                 scaled=False)
         
         # Get monthly images
         monthly_images = self.get_monthly_images(collection, region)
@@ -346,34 +1360,91 @@ class LandsatAnimator:
         
         click.echo(f"Found {len(monthly_images)} monthly images")
         
-        # Download and process images
-        image_files = []
+        # Reuse bands cached by earlier runs (in any mode) and only fetch the rest
+        band_names = self.mode_bands(mode)
+        keys = [{band: self.frame_cache_key(bounds, img_info['scene_id'], band) for band in band_names}
+                for img_info in monthly_images]
+        frames = [None] * len(monthly_images)
+        cached = [None] * len(monthly_images)
         
-        with click.progressbar(monthly_images, label='Processing images') as images:
-            for img_info in images:
+        # Render fully cached months as they are read, so raw bands never pile
+        # up across the run; group the rest by the bands they still lack, so
+        # each request only downloads bands that aren't cached yet
+        missing = {}
+        groups = self.iter_cached_frames([list(month_keys.values()) for month_keys in keys])
+        for index, layers in enumerate(groups):
+            bands = dict(zip(band_names, layers))
+            absent = tuple(band for band in band_names if bands[band] is None)
+            if absent:
+                cached[index] = {band: layer for band, layer in bands.items() if layer is not None}
+                missing.setdefault(absent, []).append(index)
+            else:
                 # Apply visualization
-                vis_image = self.apply_visualization(img_info['image'], mode)
-                
-                # Download image
-                filename = f"landsat_{img_info['date']}.png"
-                filepath = self.download_image(vis_image, region, filename)
-                image_files.append(filepath)
+                frames[index] = self.apply_visualization_np(bands, mode)
+        
+        fetched_months = sum(len(indices) for indices in missing.values())
+        if fetched_months < len(frames):
+            click.echo(f"Using {len(frames) - fetched_months} cached frames")
+        
+        # Fetch missing bands in batches, in parallel, straight into memory
+        if export_bucket:
+            # One export per worker at a time; exports have no size limit
+            fetch = functools.partial(self.export_bands, bucket=export_bucket)
+        else:
+            fetch = self.fetch_bands
+        
+        futures = {}
+        for absent, indices in missing.items():
+            batch_size = 1 if export_bucket else \
+                self.frames_per_request(bytes_per_pixel=2 * len(absent))
+            for start in range(0, len(indices), batch_size):
+                batch = indices[start:start + batch_size]
+                images = [monthly_images[index]['image'] for index in batch]
+                future = self.executor.submit(fetch, images, list(absent), grid)
+                futures[future] = batch
+        
+        try:
+            with click.progressbar(length=fetched_months, label='Processing images') as bar:
+                for future in as_completed(futures):
+                    # Keep frames in date order regardless of completion order
+                    batch = futures[future]
+                    for index, bands in zip(batch, future.result()):
+                        for band, layer in bands.items():
+                            self.store_cached_frame(keys[index][band], layer)
+                        
+                        # Apply visualization to fetched and cached bands together
+                        cached[index].update(bands)
+                        frames[index] = self.apply_visualization_np(cached[index], mode)
+                        cached[index] = None
+                    bar.update(len(batch))
+        finally:
+            # Don't leave queued requests running on the shared pool after a failure
+            for future in futures:
+                future.cancel()
+        
+        self.prune_frame_cache()
         
-        # Create GIF
-        click.echo("Creating animated GIF...")
         location_safe = location.replace(' ', '_').replace(',', '_')
-        output_filename = f"landsat_{location_safe}_{mode}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.gif"
-        gif_path = self.create_gif(image_files, output_filename, fps)
+        output_filename = (f"landsat_{location_safe}_{mode}_"
+                           f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}")
         
-        # Clean up temporary files
-        for filepath in image_files:
-            os.remove(filepath)
+        if output_format == 'mp4':
+            click.echo("Creating MP4 video...")
+            output_path = self.create_video_from_arrays(frames, output_filename, fps)
+        else:
+            # Create GIF
+            click.echo("Creating animated GIF...")
+            output_path = self.create_gif_from_arrays(frames, output_filename, fps)
+            
+            if optimize:
+                click.echo("Optimizing GIF...")
+                self.optimize_gif(output_path)
         
-        click.echo(f"\nGIF created successfully: {gif_path}")
-        click.echo(f"Number of frames: {len(image_files)}")
+        click.echo(f"\n{output_format.upper()} created successfully: {output_path}")
+        click.echo(f"Number of frames: {len(frames)}")
         click.echo(f"Frame rate: {fps} FPS")
         
-        return gif_path
+        return output_path
 
 
 @click.command()
@@ -387,7 +1458,14 @@ class LandsatAnimator:
               help='Maximum cloud cover percentage (default: 10)')
 @click.option('--fps', '-f', default=12,
               help='Frames per second for GIF (default: 12)')
-def main(location, mode, cloud_cover, fps):
+@click.option('--optimize/--no-optimize', default=True,
+              help='Recompress the GIF with gifsicle if installed (default: on)')
+@click.option('--export-bucket', default=None,
+              help='Cloud Storage bucket to fetch images through batch exports '
+                   '(for images too large for direct download; needs gcsfs and tifffile)')
+@click.option('--format', 'output_format', type=click.Choice(['gif', 'mp4']), default='gif',
+              help='Output format; mp4 needs imageio and imageio-ffmpeg (default: gif)')
+def main(location, mode, cloud_cover, fps, optimize, export_bucket, output_format):
     """
     Create animated GIF from Landsat satellite imagery
     
@@ -396,15 +1474,15 @@ def main(location, mode, cloud_cover, fps):
     changes over time.
     """
     try:
-        animator = LandsatAnimator()
-        
         # Show available modes
         click.echo("\nAvailable visualization modes:")
         for mode_name, config in LandsatAnimator.VISUALIZATION_MODES.items():
             click.echo(f"  - {mode_name}: {config['description']}")
         click.echo()
         
-        animator.generate_animation(location, mode, cloud_cover, fps)
+        with LandsatAnimator() as animator:
+            animator.generate_animation(location, mode, cloud_cover, fps, optimize, export_bucket,
+                                        output_format)
         
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
@@ -4,9 +4,23 @@ Tests for Landsat GIF Animator
 """
 
 import unittest
+from unittest import mock
+import animate
 from animate import LandsatAnimator
+import io
+import itertools
 import os
+import sys
 import shutil
+import tempfile
+import numpy as np
+from PIL import Image
+
+
+def to_dn(reflectance):
+    """Convert surface reflectance values to Collection 2 digital numbers"""
+    reflectance = np.asarray(reflectance, dtype=np.float64)
+    return np.rint((reflectance - LandsatAnimator.SR_OFFSET) / LandsatAnimator.SR_SCALE).astype(np.uint16)
 
 
 class TestLandsatAnimator(unittest.TestCase):
@@ -15,10 +29,16 @@ class TestLandsatAnimator(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures"""
         self.animator = LandsatAnimator()
+        self.addCleanup(self.animator.close)
+        self.cache_dir = tempfile.mkdtemp()
+        self.animator.cache_dir = self.cache_dir
         
     def test_get_coordinates_from_latlong(self):
         """Test coordinate parsing from lat,long string"""
-        lat, lon = self.animator.get_coordinates("37.7749,-122.4194")
+        with mock.patch('builtins.open') as open_file:
+            lat, lon = self.animator.get_coordinates("37.7749,-122.4194")
+        # Coordinates short-circuit before the geocoding cache is read
+        open_file.assert_not_called()
         self.assertAlmostEqual(lat, 37.7749, places=4)
         self.assertAlmostEqual(lon, -122.4194, places=4)
     
@@ -34,6 +54,91 @@ class TestLandsatAnimator(unittest.TestCase):
             if "Error geocoding location" in str(e):
                 self.skipTest("Geocoding service unavailable")
     
+    def test_get_coordinates_uses_cache(self):
+        """Test that geocoding results are cached on disk by normalized name"""
+        with mock.patch.object(animate, '_geocode_cached', return_value=(48.8566, 2.3522)) as geocode:
+            self.assertEqual(self.animator.get_coordinates("Paris"), (48.8566, 2.3522))
+            self.assertEqual(self.animator.get_coordinates("  PARIS "), (48.8566, 2.3522))
+            geocode.assert_called_once_with("paris")
+        
+        # A fresh animator picks the result up from disk
+        other = LandsatAnimator()
+        self.addCleanup(other.close)
+        other.cache_dir = self.cache_dir
+        with mock.patch.object(animate, '_geocode_cached') as geocode:
+            self.assertEqual(other.get_coordinates("paris"), (48.8566, 2.3522))
+            geocode.assert_not_called()
+        self.assertEqual(os.listdir(self.cache_dir), ['geocode.json'])
+    
+    def test_session_retries_transient_errors(self):
+        """Test that both schemes share an adapter that retries throttling and server errors"""
+        session = self.animator._http_session()
+        adapter = session.get_adapter('https://example.com')
+        self.assertIs(session.get_adapter('http://example.com'), adapter)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+    
+    def test_get_coordinates_many_geocodes_each_name_once(self):
+        """Test that batch geocoding skips coordinates and repeats and writes the cache"""
+        coords = {'paris': (48.8566, 2.3522), 'tokyo': (35.6762, 139.6503)}
+        with mock.patch.object(animate, '_geocode_cached', side_effect=coords.get) as geocode, \
+                mock.patch('geopy.extra.rate_limiter.default_timer', side_effect=itertools.count(step=5)):
+            results = self.animator.get_coordinates_many(['Paris', '1.5,2.5', 'Tokyo', 'PARIS'])
+        
+        self.assertEqual(results, [coords['paris'], (1.5, 2.5), coords['tokyo'], coords['paris']])
+        self.assertEqual(geocode.call_count, 2)
+        
+        other = LandsatAnimator()
+        self.addCleanup(other.close)
+        other.cache_dir = self.cache_dir
+        with mock.patch.object(animate, '_geocode_cached') as geocode:
+            self.assertEqual(other.get_coordinates('tokyo'), coords['tokyo'])
+            geocode.assert_not_called()
+    
+    def test_initialize_earth_engine_once(self):
+        """Test that Earth Engine is initialized only on the first call"""
+        with mock.patch('ee.Initialize') as initialize:
+            self.animator.initialize_earth_engine()
+            self.animator.initialize_earth_engine()
+        initialize.assert_called_once_with()
+    
+    def test_geocode_cache_uses_unique_temp_files(self):
+        """Test that each cache write goes through its own temporary file"""
+        with mock.patch('os.replace', wraps=os.replace) as replace:
+            self.animator._save_geocode_cache({'a': {'lat': 1.0, 'lon': 2.0, 'ts': 0}})
+            self.animator._save_geocode_cache({'b': {'lat': 3.0, 'lon': 4.0, 'ts': 0}})
+        
+        sources = [call.args[0] for call in replace.call_args_list]
+        self.assertEqual(len(set(sources)), 2)
+        self.assertEqual(os.listdir(self.cache_dir), ['geocode.json'])
+    
+    def test_get_coordinates_fails_fast_on_service_error(self):
+        """Test that a geocoding service error is reported without retrying"""
+        from geopy.exc import GeocoderServiceError
+        
+        with mock.patch.object(animate, '_geocode_cached',
+                               side_effect=GeocoderServiceError('offline')) as geocode, \
+                mock.patch('geopy.extra.rate_limiter.sleep') as sleep:
+            with self.assertRaisesRegex(ValueError, 'Error geocoding location'):
+                self.animator.get_coordinates('Atlantis')
+        
+        geocode.assert_called_once_with('atlantis')
+        sleep.assert_not_called()
+    
+    def test_session_created_on_first_download(self):
+        """Test that no HTTP session is built until download_image needs one"""
+        self.assertIsNone(self.animator._session)
+        self.assertIs(self.animator._http_session(), self.animator._http_session())
+    
+    def test_context_manager_closes_session(self):
+        """Test that leaving the context closes pooled connections"""
+        with LandsatAnimator() as animator:
+            session = animator._session = mock.Mock()
+        session.close.assert_called_once_with()
+        with self.assertRaises(RuntimeError):
+            animator.executor.submit(print)
+    
     def test_output_directory_created(self):
         """Test that output directory is created"""
         self.assertTrue(os.path.exists(self.animator.output_dir))
@@ -49,7 +154,7 @@ class TestLandsatAnimator(unittest.TestCase):
     def test_visualization_mode_rgb(self):
         """Test RGB visualization mode configuration"""
         rgb_config = LandsatAnimator.VISUALIZATION_MODES['rgb']
-        self.assertEqual(rgb_config['bands'], ['SR_B4', 'SR_B3', 'SR_B2'])
+        self.assertEqual(rgb_config['bands'], ('SR_B4', 'SR_B3', 'SR_B2'))
         self.assertEqual(rgb_config['min'], 0)
         self.assertEqual(rgb_config['max'], 0.3)
     
@@ -61,8 +166,379 @@ class TestLandsatAnimator(unittest.TestCase):
         self.assertEqual(ndvi_config['min'], -1)
         self.assertEqual(ndvi_config['max'], 1)
     
+    def test_visualization_modes_read_only(self):
+        """Test that the shared mode configuration cannot be modified"""
+        with self.assertRaises(TypeError):
+            LandsatAnimator.VISUALIZATION_MODES['rgb']['min'] = 0.1
+        with self.assertRaises(TypeError):
+            LandsatAnimator.VISUALIZATION_MODES['ndvi']['bands']['NIR'] = 'SR_B6'
+    
+    def test_mode_bands(self):
+        """Test that each mode lists the bands it reads"""
+        self.assertEqual(self.animator.mode_bands('rgb'), ['SR_B4', 'SR_B3', 'SR_B2'])
+        self.assertEqual(self.animator.mode_bands('ndvi'), ['SR_B5', 'SR_B4'])
+    
+    def test_apply_visualization_np_rgb(self):
+        """Test that RGB bands are stretched from [min, max] to [0, 255]"""
+        bands = {
+            'SR_B4': to_dn(np.full((2, 2), 0.3)),
+            'SR_B3': to_dn(np.full((2, 2), 0.16)),
+            'SR_B2': to_dn(np.full((2, 2), -0.1))
+        }
+        frame = self.animator.apply_visualization_np(bands, 'rgb')
+        self.assertEqual(frame.shape, (2, 2, 3))
+        self.assertEqual(frame.dtype, np.uint8)
+        np.testing.assert_array_equal(frame[0, 0], [255, 136, 0])
+    
+    def test_apply_visualization_np_ndvi_palette(self):
+        """Test that NDVI maps through the blue-white-green palette"""
+        bands = {
+            'SR_B5': to_dn([[0.0, 0.2, 0.4]]),
+            'SR_B4': to_dn([[0.4, 0.2, 0.0]])
+        }
+        frame = self.animator.apply_visualization_np(bands, 'ndvi')
+        self.assertEqual(frame.shape, (1, 3, 3))
+        np.testing.assert_array_equal(frame[0, 0], [0, 0, 255])
+        np.testing.assert_array_equal(frame[0, 2], [0, 128, 0])
+        self.assertTrue((frame[0, 1] > 250).all())
+    
+    def test_apply_visualization_np_kernels_match_numpy(self):
+        """Test that the Numba kernels render the same frames as the NumPy fallback"""
+        if animate._numba_kernels() is None:
+            self.skipTest("Numba not installed")
+        rng = np.random.default_rng(0)
+        bands = {name: rng.integers(0, 40000, (100, 16), dtype=np.uint16)
+                 for name in ('SR_B2', 'SR_B3', 'SR_B4', 'SR_B5', 'SR_B6')}
+        for mode in ('rgb', 'ndvi', 'built_up', 'snow'):
+            fast = self.animator.apply_visualization_np(bands, mode)
+            with mock.patch.object(animate, '_numba_kernels', return_value=None):
+                slow = self.animator.apply_visualization_np(bands, mode)
+            self.assertLessEqual(np.abs(fast.astype(int) - slow).max(), 1, mode)
+    
+    def test_palette_luts_precomputed(self):
+        """Test that every palette mode has a 256-entry lookup table"""
+        for mode, config in LandsatAnimator.VISUALIZATION_MODES.items():
+            if 'palette' not in config:
+                self.assertNotIn(mode, LandsatAnimator._PALETTE_LUTS)
+                continue
+            lut = LandsatAnimator._PALETTE_LUTS[mode]
+            self.assertEqual(lut.shape, (256, 3))
+            self.assertFalse(lut.flags.writeable)
+        
+        snow = LandsatAnimator._PALETTE_LUTS['snow']
+        np.testing.assert_array_equal(snow[0], [0, 0, 0])
+        np.testing.assert_array_equal(snow[255], [255, 255, 255])
+    
+    def test_download_image_streams_to_output_dir(self):
+        """Test that downloads are streamed into the requested directory"""
+        image = mock.Mock()
+        image.getDownloadURL.return_value = 'https://example.com/frame.png'
+        response = mock.MagicMock()
+        response.__enter__.return_value.iter_content.return_value = [b'abc', b'def']
+        
+        with mock.patch.object(self.animator, '_http_session') as http_session:
+            session = http_session.return_value
+            session.get.return_value = response
+            with tempfile.TemporaryDirectory() as tmpdir:
+                filepath = self.animator.download_image(image, None, 'frame.png', tmpdir)
+                self.assertEqual(filepath, os.path.join(tmpdir, 'frame.png'))
+                with open(filepath, 'rb') as f:
+                    self.assertEqual(f.read(), b'abcdef')
+            session.get.assert_called_once_with('https://example.com/frame.png', stream=True)
+    
+    def test_calculate_bounds_at_scale(self):
+        """Test that the bounding box spans ~61.44 km centred on the point"""
+        west, south, east, north = self.animator.calculate_bounds(60.0, 10.0)
+        self.assertAlmostEqual((west + east) / 2, 10.0)
+        self.assertAlmostEqual((south + north) / 2, 60.0)
+        self.assertAlmostEqual((north - south) * 111320, 61440, places=3)
+        # Longitude degrees are twice as wide as latitude degrees at 60°N
+        self.assertAlmostEqual((east - west) / (north - south), 2.0)
+    
+    def test_get_monthly_images_single_round_trip(self):
+        """Test that the picked months are fetched with one getInfo call"""
+        ee = mock.MagicMock()
+        monthly = ee.ImageCollection.return_value.sort.return_value
+        info = monthly.reduceColumns.return_value.get.return_value.getInfo
+        info.return_value = [['2020-01', 3.5, 'LC08_A_20200105'], ['2020-02', 0.2, 'LC08_A_20200221']]
+        
+        with mock.patch.dict(sys.modules, {'ee': ee}):
+            images = self.animator.get_monthly_images(mock.MagicMock(), None)
+        
+        info.assert_called_once_with()
+        monthly.toList.assert_called_once_with(2)
+        self.assertEqual([image['date'] for image in images], ['2020-01', '2020-02'])
+        self.assertEqual([image['cloud_cover'] for image in images], [3.5, 0.2])
+        self.assertEqual([image['scene_id'] for image in images],
+                         ['LC08_A_20200105', 'LC08_A_20200221'])
+    
+    def test_generate_animation_fetches_only_uncached_bands(self):
+        """Test that switching mode only downloads the bands no earlier mode cached"""
+        months = [{'image': mock.Mock(), 'date': f'2020-0{i}', 'cloud_cover': 1.0,
+                   'scene_id': f'LC08_044034_20200{i}10'} for i in range(1, 4)]
+        requested = []
+        
+        def fetch_bands(images, bands, grid):
+            requested.append(list(bands))
+            return [{band: np.full((4, 4), 10000, dtype=np.uint16) for band in bands}
+                    for _ in images]
+        
+        with mock.patch.dict(sys.modules, {'ee': mock.MagicMock()}), \
+                mock.patch.object(self.animator, 'initialize_earth_engine'), \
+                mock.patch.object(self.animator, 'get_landsat_collection'), \
+                mock.patch.object(self.animator, 'get_monthly_images', return_value=months), \
+                mock.patch.object(self.animator, 'fetch_bands', side_effect=fetch_bands), \
+                mock.patch.object(self.animator, 'create_gif_from_arrays') as create_gif:
+            self.animator.generate_animation('1.0,2.0', mode='rgb', optimize=False)
+            self.assertEqual(requested, [['SR_B4', 'SR_B3', 'SR_B2']])
+            
+            requested.clear()
+            self.animator.generate_animation('1.0,2.0', mode='ndvi', optimize=False)
+        
+        self.assertEqual(requested, [['SR_B5']])
+        self.assertEqual([frame.shape for frame in create_gif.call_args.args[0]], [(4, 4, 3)] * 3)
+    
+    def test_pixel_grid_covers_bounds(self):
+        """Test that the pixel grid spans the bounding box at output size"""
+        bounds = self.animator.calculate_bounds(37.7749, -122.4194)
+        grid = self.animator.pixel_grid(bounds)
+        transform = grid['affineTransform']
+        size = LandsatAnimator.DIMENSIONS
+        self.assertEqual(grid['dimensions'], {'width': size, 'height': size})
+        self.assertAlmostEqual(transform['translateX'], bounds[0])
+        self.assertAlmostEqual(transform['translateY'], bounds[3])
+        self.assertAlmostEqual(transform['translateX'] + transform['scaleX'] * size, bounds[2])
+        self.assertAlmostEqual(transform['translateY'] + transform['scaleY'] * size, bounds[1])
+    
+    def test_fetch_frames_splits_stacked_bands(self):
+        """Test that a stacked NPY response is split back into per-image frames"""
+        dtype = [(f'{i}_vis-{band}', 'u1') for i in range(2) for band in ('red', 'green', 'blue')]
+        pixels = np.zeros((4, 5), dtype=dtype)
+        pixels['0_vis-red'] = 10
+        pixels['1_vis-blue'] = 30
+        buffer = io.BytesIO()
+        np.save(buffer, pixels)
+        
+        with mock.patch('ee.ImageCollection'), \
+                mock.patch('ee.data.computePixels', return_value=buffer.getvalue()):
+            frames = self.animator.fetch_frames([mock.Mock(), mock.Mock()], {})
+        self.assertEqual(len(frames), 2)
+        for frame in frames:
+            self.assertEqual(frame.shape, (4, 5, 3))
+            self.assertEqual(frame.dtype, np.uint8)
+        self.assertTrue((frames[0][..., 0] == 10).all())
+        self.assertTrue((frames[0][..., 2] == 0).all())
+        self.assertTrue((frames[1][..., 2] == 30).all())
+    
+    def test_export_bands_reads_exported_geotiffs(self):
+        """Test that exported band-interleaved GeoTIFFs are split into bands"""
+        planes = np.stack([np.full((4, 5), 100, dtype=np.uint16), np.full((4, 5), 200, dtype=np.uint16)])
+        fs = mock.Mock(cat_file=mock.Mock(return_value=b'tiff'))
+        gcsfs = mock.Mock(GCSFileSystem=mock.Mock(return_value=fs))
+        tifffile = mock.Mock(imread=mock.Mock(return_value=planes))
+        task = mock.Mock(id='TASK1')
+        task.status.side_effect = [{'state': 'RUNNING'}, {'state': 'COMPLETED'}]
+        grid = self.animator.pixel_grid((-1.0, -1.0, 1.0, 1.0))
+        self.animator.EXPORT_POLL_SECONDS = 0
+        
+        with mock.patch.dict(sys.modules, {'gcsfs': gcsfs, 'tifffile': tifffile}), \
+                mock.patch('ee.batch.Export.image.toCloudStorage', return_value=task) as export:
+            results = self.animator.export_bands([mock.Mock()], ['SR_B5', 'SR_B4'], grid, 'bucket')
+        
+        task.start.assert_called_once_with()
+        task.cancel.assert_not_called()
+        self.assertEqual(export.call_args.kwargs['bucket'], 'bucket')
+        self.assertEqual(export.call_args.kwargs['dimensions'], '1024x1024')
+        self.assertEqual(len(results), 1)
+        self.assertTrue((results[0]['SR_B5'] == 100).all())
+        self.assertTrue((results[0]['SR_B4'] == 200).all())
+        self.assertEqual(results[0]['SR_B4'].shape, (4, 5))
+        fs.rm.assert_called_once()
+    
+    def test_export_bands_cancels_unfinished_tasks_on_failure(self):
+        """Test that an unknown task fails the export and cleans up the others"""
+        fs = mock.Mock()
+        gcsfs = mock.Mock(GCSFileSystem=mock.Mock(return_value=fs))
+        lost = mock.Mock(id='LOST', status=mock.Mock(return_value={'state': 'UNSUBMITTED'}))
+        running = mock.Mock(id='RUNNING', status=mock.Mock(return_value={'state': 'RUNNING'}))
+        grid = self.animator.pixel_grid((-1.0, -1.0, 1.0, 1.0))
+        self.animator.EXPORT_POLL_SECONDS = 0
+        
+        with mock.patch.dict(sys.modules, {'gcsfs': gcsfs, 'tifffile': mock.Mock()}), \
+                mock.patch('ee.batch.Export.image.toCloudStorage', side_effect=[running, lost]):
+            with self.assertRaisesRegex(ValueError, 'LOST unsubmitted'):
+                self.animator.export_bands([mock.Mock(), mock.Mock()], ['SR_B4'], grid, 'bucket')
+        
+        running.cancel.assert_called_once_with()
+        lost.cancel.assert_called_once_with()
+        fs.rm.assert_called_once()
+        fs.cat_file.assert_not_called()
+    
+    def test_export_bands_times_out(self):
+        """Test that exports still running at the deadline are cancelled"""
+        gcsfs = mock.Mock()
+        task = mock.Mock(id='SLOW', status=mock.Mock(return_value={'state': 'RUNNING'}))
+        grid = self.animator.pixel_grid((-1.0, -1.0, 1.0, 1.0))
+        self.animator.EXPORT_POLL_SECONDS = 0
+        self.animator.EXPORT_TIMEOUT_SECONDS = 0
+        
+        with mock.patch.dict(sys.modules, {'gcsfs': gcsfs, 'tifffile': mock.Mock()}), \
+                mock.patch('ee.batch.Export.image.toCloudStorage', return_value=task), \
+                mock.patch('time.monotonic', side_effect=itertools.count()):
+            with self.assertRaisesRegex(ValueError, 'did not finish'):
+                self.animator.export_bands([mock.Mock()], ['SR_B4'], grid, 'bucket')
+        
+        task.cancel.assert_called_once_with()
+        gcsfs.GCSFileSystem.return_value.rm.assert_called_once()
+    
+    def test_frame_cache_round_trip(self):
+        """Test that cached frames are keyed by region, scene and band"""
+        bounds = (-122.7, 37.5, -122.1, 38.0)
+        scene = 'LC08_044034_20200512'
+        key = self.animator.frame_cache_key(bounds, scene, 'SR_B4')
+        # A clearer scene later in the same month must not reuse the old pixels
+        self.assertNotEqual(key, self.animator.frame_cache_key(bounds, 'LC08_044034_20200528',
+                                                               'SR_B4'))
+        self.assertNotEqual(key, self.animator.frame_cache_key(bounds, scene, 'SR_B5'))
+        self.assertNotEqual(key, self.animator.frame_cache_key((-122.6, 37.5, -122.1, 38.0),
+                                                               scene, 'SR_B4'))
+        
+        self.assertIsNone(self.animator.load_cached_frame(key))
+        frame = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+        self.animator.store_cached_frame(key, frame)
+        np.testing.assert_array_equal(self.animator.load_cached_frame(key), frame)
+    
+    def test_load_cached_frames_batch(self):
+        """Test that a batch lookup returns hits in order and skips damaged blobs"""
+        self.animator.store_cached_frame('a', np.zeros((4, 4), dtype=np.uint16))
+        self.animator.store_cached_frame('b', np.ones((4, 4), dtype=np.uint16))
+        
+        frames_dir = os.path.join(self.cache_dir, 'frames')
+        for name in os.listdir(frames_dir):
+            if name.endswith('.npy') and np.load(os.path.join(frames_dir, name)).any():
+                with open(os.path.join(frames_dir, name), 'r+b') as f:
+                    f.truncate(16)
+        
+        frames = self.animator.load_cached_frames(['a', 'missing', 'b'])
+        np.testing.assert_array_equal(frames[0], np.zeros((4, 4), dtype=np.uint16))
+        self.assertIsNone(frames[1])
+        self.assertIsNone(frames[2])
+    
+    def test_iter_cached_frames_loads_one_group_at_a_time(self):
+        """Test that cached groups are read lazily, so only one is in memory at once"""
+        self.animator.store_cached_frame('a', np.zeros((4, 4), dtype=np.uint16))
+        self.animator.store_cached_frame('b', np.ones((4, 4), dtype=np.uint16))
+        
+        with mock.patch('numpy.load', wraps=np.load) as load:
+            groups = self.animator.iter_cached_frames([['a'], ['b', 'missing']])
+            first = next(groups)
+            self.assertEqual(load.call_count, 1)
+            rest = list(groups)
+        
+        np.testing.assert_array_equal(first[0], np.zeros((4, 4), dtype=np.uint16))
+        np.testing.assert_array_equal(rest[0][0], np.ones((4, 4), dtype=np.uint16))
+        self.assertIsNone(rest[0][1])
+    
+    def test_prune_frame_cache_evicts_oldest(self):
+        """Test that least recently used frames are evicted over the size cap"""
+        with mock.patch('time.time', side_effect=[1000, 1001, 1002]):
+            for i, key in enumerate(['old', 'mid', 'new']):
+                self.animator.store_cached_frame(key, np.full((32, 32, 3), i, dtype=np.uint8))
+        
+        blobs = [name for name in os.listdir(os.path.join(self.cache_dir, 'frames'))
+                 if name.endswith('.npy')]
+        frame_size = os.path.getsize(os.path.join(self.cache_dir, 'frames', blobs[0]))
+        self.animator.FRAME_CACHE_BYTES = 2 * frame_size
+        self.animator.prune_frame_cache()
+        self.assertIsNone(self.animator.load_cached_frame('old'))
+        self.assertIsNotNone(self.animator.load_cached_frame('mid'))
+        self.assertIsNotNone(self.animator.load_cached_frame('new'))
+    
+    def test_frame_cache_deduplicates_content(self):
+        """Test that identical frames under different keys share one file"""
+        frame = np.ones((8, 8), dtype=np.uint16)
+        self.animator.store_cached_frame('a', frame)
+        self.animator.store_cached_frame('b', frame.copy())
+        self.animator.store_cached_frame('c', frame.astype(np.uint8))
+        
+        blobs = [name for name in os.listdir(os.path.join(self.cache_dir, 'frames'))
+                 if name.endswith('.npy')]
+        self.assertEqual(len(blobs), 2)
+        np.testing.assert_array_equal(self.animator.load_cached_frame('b'), frame)
+        self.assertEqual(self.animator.load_cached_frame('c').dtype, np.uint8)
+    
+    def test_create_gif_from_files(self):
+        """Test that a GIF is written with one frame per input image"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.animator.output_dir = tmpdir
+            image_files = []
+            for i in range(3):
+                filepath = os.path.join(tmpdir, f'frame_{i}.png')
+                Image.fromarray(np.full((16, 16, 3), i * 80, dtype=np.uint8)).save(filepath)
+                image_files.append(filepath)
+            
+            gif_path = self.animator.create_gif(image_files, 'test.gif', fps=10)
+            with Image.open(gif_path) as gif:
+                self.assertEqual(gif.n_frames, 3)
+                self.assertEqual(gif.info['duration'], 100)
+                self.assertEqual(gif.info['loop'], 0)
+    
+    def test_create_gif_from_arrays_shares_palette(self):
+        """Test that all frames are encoded against one global palette"""
+        frames = [np.full((8, 8, 3), (i * 60, 255 - i * 60, 90), dtype=np.uint8) for i in range(4)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.animator.output_dir = tmpdir
+            gif_path = self.animator.create_gif_from_arrays(frames, 'test.gif', fps=12)
+            with Image.open(gif_path) as gif:
+                self.assertEqual(gif.n_frames, 4)
+                for i, expected in enumerate(frames):
+                    gif.seek(i)
+                    np.testing.assert_array_equal(np.asarray(gif.convert('RGB')), expected)
+    
+    def test_create_gif_grayscale_round_trips_through_shared_palette(self):
+        """Test that single-channel frames keep their gray levels through the shared palette"""
+        frames = [np.full((8, 8), i * 80, dtype=np.uint8) for i in range(3)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.animator.output_dir = tmpdir
+            gif_path = self.animator.create_gif_from_arrays(frames, 'test.gif', fps=12)
+            with Image.open(gif_path) as gif:
+                for i, expected in enumerate(frames):
+                    gif.seek(i)
+                    np.testing.assert_array_equal(np.asarray(gif.convert('L')), expected)
+    
+    def test_create_video_crops_to_even_dimensions(self):
+        """Test that MP4 frames are written through ffmpeg at even dimensions"""
+        frames = [np.zeros((7, 9, 3), dtype=np.uint8) for _ in range(2)]
+        imageio = mock.MagicMock()
+        writer = imageio.get_writer.return_value.__enter__.return_value
+        with mock.patch.dict(sys.modules, {'imageio': imageio, 'imageio_ffmpeg': mock.Mock()}):
+            path = self.animator.create_video_from_arrays(frames, 'test.mp4', fps=6)
+        
+        self.assertEqual(path, os.path.join(self.animator.output_dir, 'test.mp4'))
+        self.assertEqual(imageio.get_writer.call_args.kwargs['codec'], 'libx264')
+        self.assertEqual(imageio.get_writer.call_args.kwargs['fps'], 6)
+        self.assertEqual([call.args[0].shape for call in writer.append_data.call_args_list],
+                         [(6, 8, 3), (6, 8, 3)])
+    
+    def test_optimize_gif_runs_gifsicle(self):
+        """Test that gifsicle is invoked in place when it is installed"""
+        with mock.patch('shutil.which', return_value='/usr/bin/gifsicle'), \
+                mock.patch('subprocess.run') as run:
+            self.assertTrue(self.animator.optimize_gif('out.gif'))
+            run.assert_called_once_with(
+                ['gifsicle', '-O3', '--lossy=30', '-o', 'out.gif', 'out.gif'], check=True)
+    
+    def test_optimize_gif_without_gifsicle(self):
+        """Test that optimization is skipped when gifsicle is missing"""
+        with mock.patch('shutil.which', return_value=None), \
+                mock.patch('subprocess.run') as run:
+            self.assertFalse(self.animator.optimize_gif('out.gif'))
+            run.assert_not_called()
+    
     def tearDown(self):
         """Clean up after tests"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        
         # Remove test output directory if it was created
         if os.path.exists('output') and not os.listdir('output'):
             shutil.rmtree('output')